@@ -1,4 +1,11 @@
-from est_egg.software_analyst_agent import SoftwareAnalystAgent
+from importlib import import_module
+
 from est_egg.markdown_file_reader import MarkdownFileReader
 
 __all__ = ['SoftwareAnalystAgent', 'MarkdownFileReader']
+
+def __getattr__(name):
+    # SoftwareAnalystAgent drags in atomic_agents, instructor and openai; load it on first use
+    if name == 'SoftwareAnalystAgent':
+        return import_module('est_egg.software_analyst_agent').SoftwareAnalystAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
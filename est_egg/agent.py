@@ -1,7 +1,6 @@
 from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List
 from langchain_core.prompts import ChatPromptTemplate
 
@@ -15,9 +14,11 @@ class AnalysisResult(BaseModel):
     apis: List[ApiEstimate] = Field(default_factory=list)  # Added default value
     total_estimate: float = Field(default=0.0)  # Added default value
 
-
-def calculate_total_estimate(apis: List[ApiEstimate]) -> float:
-    return sum(api.estimate for api in apis)
+    @model_validator(mode="after")
+    def compute_total_estimate(self) -> "AnalysisResult":
+        # Derive the total once at validation time instead of trusting the LLM's sum
+        self.total_estimate = sum(api.estimate for api in self.apis)
+        return self
 
 def format_output(analysis_result: AnalysisResult) -> str:
     output_lines = [
@@ -59,16 +60,13 @@ def analyze_features(input_text: str) -> AnalysisResult:
     #     template=template,
     #     input_variables=["input"]
     # )
-    print('input_text', input_text)
     # Generate analysis using new invoke pattern
     chain = prompt | llm | parser
     output = chain.invoke({"query": input_text})
 
-    print('output:', output)
-    # Calculate total
-    total = calculate_total_estimate(output)
-    print('total:', total)
-    return AnalysisResult(apis=output, total_estimate=total)
+    # The parser already yields an AnalysisResult with total_estimate computed
+    # during validation; text rendering is left to format_output at display time
+    return output
 
 
 # from typing import Union, Annotated, TypedDict, Optional
@@ -18,6 +18,10 @@ def main():
     text_parser = subparsers.add_parser("analyze-text", help="Analyze requirements from text input")
     text_parser.add_argument("--text", required=True, help="Requirement text to analyze")
     
+    # Command for analyzing several independent requirements in batched calls
+    batch_parser = subparsers.add_parser("analyze-batch", help="Analyze several independent requirements")
+    batch_parser.add_argument("--text", required=True, action="append", help="Requirement text to analyze; repeat for each requirement")
+    
     # Command for analyzing markdown files
     md_parser = subparsers.add_parser("analyze-file", help="Analyze requirements from a markdown file")
     md_parser.add_argument("--file", required=True, help="Path to the markdown file containing requirements")
@@ -41,6 +45,9 @@ def main():
         if args.command == "analyze-text":
             result = analyst.analyze_from_text(args.text)
             analyst.print_analysis_results(result)
+        elif args.command == "analyze-batch":
+            for result in analyst.analyze_batch(args.text):
+                analyst.print_analysis_results(result)
         elif args.command == "analyze-file":
             result = analyst.analyze_from_markdown(args.file)
             analyst.print_analysis_results(result)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".est_egg", "cache")
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MEMORY_SIZE = 128
+
+class LLMCache:
+    """
+    Two-tier cache for serialized LLM responses, keyed by a hash of the prompt.
+
+    Recent entries are kept in an in-memory LRU; everything is persisted to SQLite
+    and expires after the TTL.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 memory_size: int = DEFAULT_MEMORY_SIZE):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "llm_cache.sqlite3")
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - ttl,))
+
+    @staticmethod
+    def make_key(**parts: str) -> str:
+        """
+        Build a content-addressed cache key.
+
+        Args:
+            parts: Everything that influences the response (model, system prompt hash, prompt text, ...)
+
+        Returns:
+            SHA-256 hex digest of the normalized parts
+        """
+        normalized = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, checking memory before disk.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The stored response, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = (row[0], row[1])
+                self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+            value, created_at = entry
+            if now - created_at > self.ttl:
+                self._memory.pop(key, None)
+                return None
+            return value
+
+    def set(self, key: str, value: str):
+        """
+        Store a response, replacing any previous entry for the key.
+
+        Args:
+            key: Cache key from make_key
+            value: Serialized response
+        """
+        entry = (value, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, *entry)
+                )
+
+    def _remember(self, key: str, entry):
+        """Add an entry to the in-memory LRU, evicting the least recently used one when full."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
@@ -1,6 +1,13 @@
+import mmap
 import os
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Markdown heading: one to six '#' characters, whitespace, then the title
+_HEADING_RE = re.compile(r'^#{1,6}\s+(.*)$')
+
+# Files above this size are hinted to the kernel as sequentially read
+_SEQUENTIAL_READ_THRESHOLD = 10 * 1024 * 1024
 
 class MarkdownFileReader:
     """
@@ -24,6 +31,56 @@ class MarkdownFileReader:
         with open(file_path, 'r', encoding='utf-8') as file:
             return file.read()
     
+    @staticmethod
+    def read_file_fast(file_path: str) -> str:
+        """
+        Read the content of a markdown file through a memory map, skipping the buffered read copy.
+        
+        Args:
+            file_path: Path to the markdown file
+            
+        Returns:
+            Content of the file as a string
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        with open(file_path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                # mmap cannot map an empty file
+                return ""
+            
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if size > _SEQUENTIAL_READ_THRESHOLD and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                return str(mapped, 'utf-8')
+    
+    @staticmethod
+    def _iter_sections(content: str) -> Iterator[Tuple[Optional[str], List[str]]]:
+        """
+        Walk the content once, grouping lines under the heading they belong to.
+        
+        Args:
+            content: Markdown content
+            
+        Yields:
+            (heading title, body lines) pairs; content before the first heading has a title of None
+        """
+        title = None
+        lines = []
+        
+        for line in content.splitlines():
+            match = _HEADING_RE.match(line)
+            if match:
+                yield title, lines
+                title = match.group(1)
+                lines = []
+            else:
+                lines.append(line)
+        
+        yield title, lines
+    
     @staticmethod
     def extract_sections(content: str) -> Dict[str, str]:
         """
@@ -36,25 +93,10 @@ class MarkdownFileReader:
             Dictionary with heading titles as keys and section content as values
         """
         sections = {}
-        current_section = "main"
-        section_content = []
         
-        lines = content.split('\n')
-        
-        for line in lines:
-            if line.startswith('#'):
-                if section_content:  # Save previous section
-                    sections[current_section] = '\n'.join(section_content).strip()
-                    section_content = []
-                
-                # Extract new section title (remove # characters and trim)
-                current_section = re.sub(r'^#+\s*', '', line).strip()
-            else:
-                section_content.append(line)
-        
-        # Save the last section
-        if section_content:
-            sections[current_section] = '\n'.join(section_content).strip()
+        for title, lines in MarkdownFileReader._iter_sections(content):
+            if lines:
+                sections["main" if title is None else title.strip()] = '\n'.join(lines).strip()
         
         return sections
     
@@ -68,17 +110,21 @@ class MarkdownFileReader:
             content: Markdown content as string
             
         Returns:
-            List of extracted requirements
+            List of extracted requirements, without duplicates
         """
         # Simple extraction: consider all content as requirements
         # In a more advanced implementation, you could look for specific sections
         # marked with headers like "## Requirements" or bullet points
         
-        # Split by headers to identify potential requirement sections
-        sections = re.split(r'^#{1,6}\s+', content, flags=re.MULTILINE)
-        
-        # Filter out empty sections
-        requirements = [section.strip() for section in sections if section.strip()]
+        # Each heading starts a new requirement section made of its title and body;
+        # repeated sections are kept once, tracked in a set for O(1) lookups
+        requirements = []
+        seen = set()
+        for title, lines in MarkdownFileReader._iter_sections(content):
+            section = '\n'.join(lines if title is None else [title, *lines]).strip()
+            if section and section not in seen:
+                seen.add(section)
+                requirements.append(section)
         
         # If no clear sections, return the whole content
         if not requirements:
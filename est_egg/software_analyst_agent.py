@@ -1,13 +1,23 @@
-from typing import List, Dict, Optional, Any
-from pydantic import Field
-from atomic_agents.lib.components.agent_memory import AgentMemory
-from atomic_agents.agents.base_agent import BaseAgent, BaseAgentConfig, BaseIOSchema, BaseAgentOutputSchema
-from atomic_agents.lib.components.system_prompt_generator import SystemPromptContextProviderBase, SystemPromptGenerator
+from typing import List, Dict, Iterator, Optional, Tuple
+from pydantic import ConfigDict, Field, ValidationError
+from pydantic_core import from_json
+from atomic_agents.agents.base_agent import BaseAgent, BaseAgentConfig, BaseIOSchema
+from atomic_agents.lib.components.system_prompt_generator import SystemPromptGenerator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import httpx
+import json
 import instructor
 import openai
+import orjson
 import os
 import re
+import time
+from tenacity import AsyncRetrying, Retrying, retry, retry_if_exception_type, stop_after_attempt, stop_after_delay, wait_exponential_jitter
 from est_egg.markdown_file_reader import MarkdownFileReader
+from est_egg.llm_cache import LLMCache
 
 class SoftwareAnalysisInputSchema(BaseIOSchema):
     """
@@ -18,16 +28,20 @@ class SoftwareAnalysisInputSchema(BaseIOSchema):
 
 class TaskBreakdown(BaseIOSchema):
     """Schema for a single task in the breakdown."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     task_id: str = Field(description="Unique identifier for the task")
     parent_id: Optional[str] = Field(default=None, description="Parent task ID if this is a subtask")
     task_name: str = Field(description="Name of the task")
     description: Optional[str] = Field(default=None, description="Detailed description of the task")
     difficulty: Optional[str] = Field(default=None, description="Difficulty level: Easy, Medium, Hard")
     time_estimate: Optional[str] = Field(default=None, description="Estimated time to complete (e.g., '2-4 hours', '1-2 days')")
-    subtasks: List["TaskBreakdown"] = Field(default=[], description="Child tasks or subtasks")
+    subtasks: List["TaskBreakdown"] = Field(default_factory=list, description="Child tasks or subtasks")
 
 class APIEndpoint(BaseIOSchema):
     """Schema for API endpoint analysis."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     endpoint: Optional[str] = Field(default=None, description="API endpoint path")
     method: Optional[str] = Field(default=None, description="HTTP method (GET, POST, PUT, DELETE, etc.)")
     purpose: Optional[str] = Field(default=None, description="Purpose of this endpoint")
@@ -36,12 +50,16 @@ class APIEndpoint(BaseIOSchema):
 
 class ERDEntity(BaseIOSchema):
     """Schema for ERD entity analysis."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     entity_name: Optional[str] = Field(default=None, description="Name of the entity")
     attributes: Optional[Dict[str, str]] = Field(default=None, description="Attributes with their data types")
     relationships: Optional[List[str]] = Field(default=None, description="Relationships with other entities")
 
 class DevelopmentComponent(BaseIOSchema):
     """Schema for a component in the development view."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     component_name: str = Field(description="Name of the component")
     description: Optional[str] = Field(default=None, description="Description of what the component does")
     responsibilities: Optional[List[str]] = Field(default=None, description="Key responsibilities of this component")
@@ -50,6 +68,8 @@ class DevelopmentComponent(BaseIOSchema):
     
 class ProcessFlow(BaseIOSchema):
     """Schema for a flow in the process view."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     flow_name: str = Field(description="Name of the process flow")
     description: Optional[str] = Field(default=None, description="Description of what this flow does")
     actors: Optional[List[str]] = Field(default=None, description="Actors involved in this process")
@@ -60,21 +80,106 @@ class SoftwareAnalysisOutputSchema(BaseIOSchema):
     Schema for the output from the software analysis agent.
     """
     summary: Optional[str] = Field(default=None, description="Summary of the analysis for the requirement.")
-    task_breakdown: Optional[List[TaskBreakdown]] = Field(default=[], description="Hierarchical breakdown of tasks needed to implement the requirement.")
+    task_breakdown: Optional[List[TaskBreakdown]] = Field(default_factory=list, description="Hierarchical breakdown of tasks needed to implement the requirement.")
     total_estimate: Optional[str] = Field(default=None, description="Total estimated time to complete all tasks.")
-    api_analysis: List[APIEndpoint] = Field(default=[], description="Analysis of required API endpoints.")
-    erd_analysis: List[ERDEntity] = Field(default=[], description="Analysis of required database entities and relationships.")
-    development_view: List[DevelopmentComponent] = Field(default=[], description="Analysis of software components and packages.")
-    process_view: List[ProcessFlow] = Field(default=[], description="Analysis of process flows (sequence and activity).")
-    risks_and_considerations: Optional[List[str]] = Field(default=[], description="Potential risks and considerations for implementation.")
-    suggested_questions: Optional[List[str]] = Field(default=[], description="Suggested follow-up questions for further analysis.")
+    api_analysis: List[APIEndpoint] = Field(default_factory=list, description="Analysis of required API endpoints.")
+    erd_analysis: List[ERDEntity] = Field(default_factory=list, description="Analysis of required database entities and relationships.")
+    development_view: List[DevelopmentComponent] = Field(default_factory=list, description="Analysis of software components and packages.")
+    process_view: List[ProcessFlow] = Field(default_factory=list, description="Analysis of process flows (sequence and activity).")
+    risks_and_considerations: Optional[List[str]] = Field(default_factory=list, description="Potential risks and considerations for implementation.")
+    suggested_questions: Optional[List[str]] = Field(default_factory=list, description="Suggested follow-up questions for further analysis.")
     mermaid_task_diagram: Optional[str] = Field(default=None, description="Mermaid code for visualizing task hierarchy.")
     mermaid_erd_diagram: Optional[str] = Field(default=None, description="Mermaid code for visualizing entity relationships.")
     mermaid_component_diagram: Optional[str] = Field(default=None, description="Mermaid code for visualizing component relationships.")
     mermaid_sequence_diagram: Optional[str] = Field(default=None, description="Mermaid code for visualizing sequence flows.")
 
+class BatchedSoftwareAnalysisOutputSchema(BaseIOSchema):
+    """
+    Schema for the output of a batched analysis covering several requirements at once.
+    """
+    results: List[SoftwareAnalysisOutputSchema] = Field(default_factory=list, description="One analysis per numbered requirement, in the same order as the input.")
+
 # Update circular reference for TaskBreakdown
-TaskBreakdown.update_forward_refs()
+TaskBreakdown.model_rebuild()
+
+def _construct(model, data: dict):
+    """Build a model without validation; required fields missing from partial data are set to None."""
+    return model.model_construct(**{
+        **{name: None for name, field in model.model_fields.items() if field.is_required()},
+        **data
+    })
+
+def _construct_tasks(tasks: List[dict]) -> List[TaskBreakdown]:
+    """Recursively build TaskBreakdown models from trusted data without validation."""
+    return [
+        _construct(TaskBreakdown, {**task, "subtasks": _construct_tasks(task.get("subtasks") or [])})
+        for task in tasks
+    ]
+
+def _construct_output(data: dict) -> SoftwareAnalysisOutputSchema:
+    """
+    Rebuild an analysis from trusted data (e.g. the response cache or a partially
+    streamed response) without validation.
+    
+    model_construct does not recurse, so every nested model list is constructed explicitly.
+    """
+    return _construct(SoftwareAnalysisOutputSchema, {
+        **data,
+        "task_breakdown": _construct_tasks(data.get("task_breakdown") or []),
+        "api_analysis": [_construct(APIEndpoint, api) for api in data.get("api_analysis") or []],
+        "erd_analysis": [_construct(ERDEntity, entity) for entity in data.get("erd_analysis") or []],
+        "development_view": [_construct(DevelopmentComponent, component) for component in data.get("development_view") or []],
+        "process_view": [_construct(ProcessFlow, flow) for flow in data.get("process_view") or []]
+    })
+
+# Maximum number of requirements packed into a single batched LLM call; each analysis is a
+# large structured output, so only a few fit within one response's output token limit
+MAX_BATCH = 3
+
+# Models used for analysis; with route_short_requirements, short requirements go to the cheaper, faster small model
+DEFAULT_MODEL = os.environ.get("EST_MODEL", "gpt-4o")
+SMALL_MODEL = os.environ.get("EST_MODEL_SMALL", "gpt-4o-mini")
+SMALL_MODEL_MAX_CHARS = 200
+
+# Sampling temperature sent on every path (agent, async and streamed), so results stored under
+# the same cache key are produced the same way
+TEMPERATURE = 0
+
+# HTTP/2 connection pool settings shared by the sync and async clients, sized for concurrent
+# batches; responses are long structured outputs, so the read timeout is generous
+_HTTP_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# instructor's own retries, passed as max_retries to every structured call: reask only when the
+# response fails to parse or validate. Any other error (including IncompleteOutputException on a
+# truncated response) is raised as-is instead of being retried back-to-back and wrapped in
+# InstructorRetryException. Retrying objects hold per-run state, so each call builds its own
+_VALIDATION_RETRY = dict(
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception_type((ValidationError, json.JSONDecodeError))
+)
+
+# Backoff for rate limits and dropped connections (APITimeoutError subclasses APIConnectionError,
+# which also wraps httpx protocol errors). The OpenAI clients are created with max_retries=0 and
+# instructor only retries validation failures, so this is the only layer that retries transport
+# errors; it stops after 6 attempts or 10 minutes, whichever comes first
+_retry_transient_errors = retry(
+    stop=stop_after_attempt(6) | stop_after_delay(600),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    retry=retry_if_exception_type((openai.RateLimitError, openai.APIConnectionError)),
+    reraise=True
+)
+
+# Leading output fields that stream_from_text previews, and how often it re-parses the growing
+# arguments; each parse covers everything received so far, so parsing every chunk is quadratic
+_PREVIEW_FIELDS = frozenset({"summary", "task_breakdown", "total_estimate", "api_analysis"})
+_PREVIEW_INTERVAL = 0.2
+
+# Diagram header checks used by _fix_mermaid_diagrams
+_TASK_DIAGRAM_RE = re.compile(r'^(graph|flowchart)\s+[TBLR]D')
+_ERD_DIAGRAM_RE = re.compile(r'^erDiagram')
+_COMPONENT_DIAGRAM_RE = re.compile(r'^(graph|flowchart|classDiagram|C4Context)')
+_SEQUENCE_DIAGRAM_RE = re.compile(r'^sequenceDiagram')
 
 # Set up the system prompt
 system_prompt_generator = SystemPromptGenerator(
@@ -119,46 +224,428 @@ system_prompt_generator = SystemPromptGenerator(
     ]
 )
 
+# The prompt has no context providers, so generate it once and serve the same string on every
+# call: a byte-identical prefix is what lets the provider's automatic prompt cache hit
+_FROZEN_SYSTEM_PROMPT = system_prompt_generator.generate_prompt()
+system_prompt_generator.generate_prompt = lambda: _FROZEN_SYSTEM_PROMPT
+
+# Part of the response cache key, so editing the prompt invalidates earlier analyses
+SYSTEM_PROMPT_HASH = hashlib.sha256(_FROZEN_SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+
 class SoftwareAnalystAgent:
     """
     Agent for analyzing software requirements and generating estimations and diagrams.
     """
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, max_concurrency: int = 8, use_cache: bool = True, route_short_requirements: bool = False):
         if api_key is None:
             api_key = os.environ.get("OPENAI_API_KEY")
         
         if not api_key:
             raise ValueError("API key is required for SoftwareAnalystAgent")
         
-        self.agent = BaseAgent(
+        self.api_key = api_key
+        self.model = DEFAULT_MODEL
+        self.small_model = SMALL_MODEL
+        self.route_short_requirements = route_short_requirements
+        self.max_concurrency = max_concurrency
+        self.cache = LLMCache() if use_cache else None
+        # One pooled HTTP/2 client shared by every call
+        http_client = httpx.Client(http2=True, timeout=_HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+        self.client = instructor.from_openai(
+            openai.OpenAI(api_key=api_key, http_client=http_client, max_retries=0),
+            mode=instructor.Mode.TOOLS
+        )
+    
+    def _build_agent(self, output_schema, model: Optional[str] = None) -> BaseAgent:
+        """
+        Create a BaseAgent sharing this analyst's client and system prompt.
+        
+        Args:
+            output_schema: Schema the agent should return
+            model: Model to use; defaults to the analyst's main model
+            
+        Returns:
+            Configured BaseAgent
+        """
+        return BaseAgent(
             config=BaseAgentConfig(
-                client=instructor.from_openai(openai.OpenAI(api_key=api_key)),
-                model="gpt-4o",
+                client=self.client,
+                model=model or self.model,
                 system_prompt_generator=system_prompt_generator,
                 input_schema=SoftwareAnalysisInputSchema,
-                output_schema=SoftwareAnalysisOutputSchema
+                output_schema=output_schema,
+                model_api_parameters={"temperature": TEMPERATURE, "max_retries": Retrying(**_VALIDATION_RETRY)}
             )
         )
     
-    def analyze_from_text(self, requirement_text: str) -> SoftwareAnalysisOutputSchema:
+    def analyze_from_text(self, requirement_text: str, force_refresh: bool = False) -> SoftwareAnalysisOutputSchema:
         """
         Analyze requirements from direct text input.
         
         Args:
             requirement_text: The requirement text to analyze
+            force_refresh: Bypass the response cache and always call the LLM
             
         Returns:
             Analysis result with task breakdown and diagrams
         """
+        model = self._select_model(requirement_text)
+        cache_key, cached = self._cache_lookup(requirement_text, model, force_refresh)
+        if cached is not None:
+            return cached
+        
         input_data = SoftwareAnalysisInputSchema(requirement=requirement_text)
-        result = self.agent.run(input_data)
+        result = self._run_with_retry(SoftwareAnalysisOutputSchema, input_data, model)
         
         # Validate and fix common issues with Mermaid diagrams
         self._fix_mermaid_diagrams(result)
         
+        if cache_key is not None:
+            self.cache.set(cache_key, result.model_dump_json())
+        
         return result
     
+    async def analyze_from_text_async(self, requirement_text: str, force_refresh: bool = False) -> SoftwareAnalysisOutputSchema:
+        """
+        Asynchronously analyze requirements from direct text input.
+        
+        Args:
+            requirement_text: The requirement text to analyze
+            force_refresh: Bypass the response cache and always call the LLM
+            
+        Returns:
+            Analysis result with task breakdown and diagrams
+        """
+        async with self._open_async_client() as client:
+            return await self._analyze_text_async(client, requirement_text, force_refresh)
+    
+    async def _analyze_text_async(self, client, requirement_text: str, force_refresh: bool = False) -> SoftwareAnalysisOutputSchema:
+        """
+        Analyze requirement text through an async client opened by the caller.
+        
+        Args:
+            client: Async instructor client from _open_async_client
+            requirement_text: The requirement text to analyze
+            force_refresh: Bypass the response cache and always call the LLM
+            
+        Returns:
+            Analysis result with task breakdown and diagrams
+        """
+        model = self._select_model(requirement_text)
+        cache_key, cached = self._cache_lookup(requirement_text, model, force_refresh)
+        if cached is not None:
+            return cached
+        
+        input_data = SoftwareAnalysisInputSchema(requirement=requirement_text)
+        result = await self._create_async(client, model, input_data)
+        
+        self._fix_mermaid_diagrams(result)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, result.model_dump_json())
+        
+        return result
+    
+    async def analyze_many_async(self, requirement_texts: List[str]) -> List[SoftwareAnalysisOutputSchema]:
+        """
+        Analyze several requirements concurrently, one LLM call each, at most max_concurrency at a time.
+        
+        The analyses share one connection pool, opened for this call and closed once they all finish.
+        
+        Args:
+            requirement_texts: Requirement texts to analyze
+            
+        Returns:
+            One analysis result per requirement, in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        
+        async with self._open_async_client() as client:
+            async def analyze(text):
+                async with semaphore:
+                    return await self._analyze_text_async(client, text)
+            
+            return list(await asyncio.gather(*(analyze(text) for text in requirement_texts)))
+    
+    def analyze_many(self, requirement_texts: List[str]) -> List[SoftwareAnalysisOutputSchema]:
+        """
+        Synchronous wrapper around analyze_many_async for callers without an event loop.
+        
+        Args:
+            requirement_texts: Requirement texts to analyze
+            
+        Returns:
+            One analysis result per requirement, in input order
+        """
+        return asyncio.run(self.analyze_many_async(requirement_texts))
+    
+    def stream_from_text(self, requirement_text: str, force_refresh: bool = False) -> Iterator[SoftwareAnalysisOutputSchema]:
+        """
+        Analyze requirements from direct text input, yielding partial results as the LLM streams them.
+        
+        Partial results may have missing fields. They cover the summary, tasks, total estimate
+        and API endpoints, are produced at most every _PREVIEW_INTERVAL seconds, and stop once
+        those sections are complete. The last value yielded is the complete,
+        validated result, which is cached like analyze_from_text results. If the streamed
+        result fails validation, it is replaced by a fresh analyze_from_text result;
+        a stream with no analysis at all raises ValueError.
+        
+        Args:
+            requirement_text: The requirement text to analyze
+            force_refresh: Bypass the response cache and always call the LLM
+            
+        Yields:
+            Progressively more complete analysis results
+        """
+        model = self._select_model(requirement_text)
+        cache_key, cached = self._cache_lookup(requirement_text, model, force_refresh)
+        if cached is not None:
+            yield cached
+            return
+        
+        # instructor's create_partial cannot wrap the self-referencing TaskBreakdown (Partial[...]
+        # recurses without end), so stream the tool call directly and parse its arguments as they grow
+        stream = self._open_stream(model, SoftwareAnalysisInputSchema(requirement=requirement_text))
+        
+        arguments = ""
+        previewing = True
+        last_preview = 0.0
+        for chunk in stream:
+            tool_calls = chunk.choices[0].delta.tool_calls if chunk.choices else None
+            if not tool_calls or not tool_calls[0].function.arguments:
+                continue
+            arguments += tool_calls[0].function.arguments
+            
+            now = time.monotonic()
+            if previewing and now - last_preview >= _PREVIEW_INTERVAL:
+                last_preview = now
+                data = from_json(arguments, allow_partial="trailing-strings")
+                # Fields arrive in schema order, so once a later field has started the previewed ones are complete
+                previewing = not data or next(reversed(data)) in _PREVIEW_FIELDS
+                yield _construct_output(data)
+        
+        if not arguments:
+            raise ValueError("The model returned no analysis")
+        
+        try:
+            result = SoftwareAnalysisOutputSchema.model_validate_json(arguments)
+        except ValidationError:
+            # Unlike instructor, the raw stream has no validation retry, so redo the request through the agent
+            yield self.analyze_from_text(requirement_text, force_refresh=True)
+            return
+        
+        self._fix_mermaid_diagrams(result)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, result.model_dump_json())
+        
+        yield result
+    
+    @_retry_transient_errors
+    def _open_stream(self, model: str, input_data: SoftwareAnalysisInputSchema):
+        """
+        Start a streamed analysis as a forced tool call, with the same retry policy as agent runs.
+        
+        The tool schema is the one instructor sends in TOOLS mode, so the streamed
+        arguments validate against SoftwareAnalysisOutputSchema.
+        
+        Args:
+            model: Model to use
+            input_data: The analysis input
+            
+        Returns:
+            The OpenAI chat completion stream
+        """
+        tool = instructor.openai_schema(SoftwareAnalysisOutputSchema).openai_schema
+        return self.client.client.chat.completions.create(
+            model=model,
+            messages=self._build_messages(input_data),
+            tools=[{"type": "function", "function": tool}],
+            tool_choice={"type": "function", "function": {"name": tool["name"]}},
+            temperature=TEMPERATURE,
+            stream=True
+        )
+    
+    @_retry_transient_errors
+    def _run_with_retry(self, output_schema, input_data: SoftwareAnalysisInputSchema, model: Optional[str] = None):
+        """
+        Run a fresh agent, backing off and retrying on rate limits and connection failures.
+        
+        Each analysis is independent and AgentMemory is not thread-safe, so every attempt
+        gets its own agent: concurrent requests (e.g. Streamlit sessions sharing one analyst)
+        never see each other's messages, and a retry does not repeat the failed user turn.
+        
+        Args:
+            output_schema: Schema the agent should return
+            input_data: The analysis input
+            model: Model to use; defaults to the analyst's main model
+            
+        Returns:
+            The agent's response
+        """
+        return self._build_agent(output_schema, model).run(input_data)
+    
+    @_retry_transient_errors
+    async def _create_async(self, client, model: str, input_data: SoftwareAnalysisInputSchema) -> SoftwareAnalysisOutputSchema:
+        """
+        Request an analysis through an async client, with the same retry policy as agent runs.
+        
+        Args:
+            client: Async instructor client from _open_async_client
+            model: Model to use
+            input_data: The analysis input
+            
+        Returns:
+            The validated analysis
+        """
+        return await client.chat.completions.create(
+            model=model,
+            messages=self._build_messages(input_data),
+            response_model=SoftwareAnalysisOutputSchema,
+            temperature=TEMPERATURE,
+            max_retries=AsyncRetrying(**_VALIDATION_RETRY)
+        )
+    
+    @asynccontextmanager
+    async def _open_async_client(self):
+        """
+        Open an async instructor client with its own connection pool, closed on exit.
+        
+        The pool belongs to the caller rather than the analyst, so overlapping calls (in the same
+        or different event loops) never close a pool another call is still using.
+        
+        Yields:
+            Async instructor client
+        """
+        # Concurrent analyses multiplex over the same pooled HTTP/2 connections
+        async with httpx.AsyncClient(http2=True, timeout=_HTTP_TIMEOUT, limits=_HTTP_LIMITS) as http_client:
+            yield instructor.from_openai(
+                openai.AsyncOpenAI(api_key=self.api_key, http_client=http_client, max_retries=0),
+                mode=instructor.Mode.TOOLS
+            )
+    
+    def _select_model(self, requirement_text: str) -> str:
+        """
+        Pick the model for a requirement: short inputs rarely benefit from the larger model,
+        so with route_short_requirements enabled they go to the small model.
+        
+        Args:
+            requirement_text: The requirement text to analyze
+            
+        Returns:
+            Model name
+        """
+        if self.route_short_requirements and len(requirement_text) < SMALL_MODEL_MAX_CHARS:
+            return self.small_model
+        return self.model
+    
+    def _cache_lookup(self, requirement_text: str, model: str, force_refresh: bool = False) -> Tuple[Optional[str], Optional[SoftwareAnalysisOutputSchema]]:
+        """
+        Look up a cached analysis for the requirement text.
+        
+        Args:
+            requirement_text: The requirement text to analyze
+            model: Model the analysis is run with
+            force_refresh: Skip the lookup but still return the key so the fresh result gets stored
+            
+        Returns:
+            (cache key, cached result); the key is None when caching is disabled
+        """
+        if self.cache is None:
+            return None, None
+        
+        cache_key = LLMCache.make_key(model=model, system_prompt=SYSTEM_PROMPT_HASH, requirement=requirement_text)
+        cached = None if force_refresh else self.cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        # Cached entries were validated when stored, so skip re-validating the whole tree
+        return cache_key, _construct_output(orjson.loads(cached))
+    
+    def _build_messages(self, input_data: SoftwareAnalysisInputSchema) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for calls made directly on the client rather than through BaseAgent.
+        
+        Args:
+            input_data: The analysis input
+            
+        Returns:
+            System and user messages in OpenAI chat format
+        """
+        return [
+            {"role": "system", "content": _FROZEN_SYSTEM_PROMPT},
+            # Serialized the same way as BaseAgent's memory so both paths send identical requests
+            {"role": "user", "content": json.dumps(input_data.model_dump(mode="json"))}
+        ]
+    
+    def analyze_batch(self, requirements: List[str]) -> List[SoftwareAnalysisOutputSchema]:
+        """
+        Analyze several independent requirements, packing up to MAX_BATCH of them
+        into each LLM call and running up to max_concurrency calls in parallel.
+        
+        Args:
+            requirements: List of requirement texts to analyze
+            
+        Returns:
+            One analysis result per requirement, in input order
+        """
+        chunks = [requirements[start:start + MAX_BATCH] for start in range(0, len(requirements), MAX_BATCH)]
+        if len(chunks) <= 1 or self.max_concurrency <= 1:
+            return [result for chunk in chunks for result in self._analyze_chunk(chunk)]
+        
+        # Calls are network-bound, so threads overlap their latency; map() keeps input order
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as executor:
+            return [result for chunk_results in executor.map(self._analyze_chunk, chunks) for result in chunk_results]
+    
+    def _analyze_chunk(self, requirements: List[str]) -> List[SoftwareAnalysisOutputSchema]:
+        """
+        Analyze one chunk of requirements with a single batched LLM call.
+        
+        Args:
+            requirements: Requirement texts, at most MAX_BATCH of them
+            
+        Returns:
+            One analysis result per requirement, in input order
+        """
+        input_data = SoftwareAnalysisInputSchema(requirement=(
+            f"Analyze each of the following {len(requirements)} requirements independently "
+            f"and return exactly one result per requirement, in the same order.\n\n"
+            f"{self._number_requirements(requirements)}"
+        ))
+        try:
+            batch = self._run_with_retry(BatchedSoftwareAnalysisOutputSchema, input_data)
+            results = list(batch.results[:len(requirements)])
+        except (instructor.exceptions.IncompleteOutputException, instructor.exceptions.InstructorRetryException):
+            # The batched response was cut off at the output token limit (raised on the first response,
+            # without a reask) or still failed validation after the reasks. Rate limits and connection
+            # errors are not caught: they propagate once _run_with_retry gives up, rather than fanning
+            # out into more per-item calls against an API that is already failing
+            results = []
+        
+        # Fall back to individual calls for anything the model left out
+        for text in requirements[len(results):]:
+            results.append(self._run_with_retry(SoftwareAnalysisOutputSchema, SoftwareAnalysisInputSchema(requirement=text)))
+        
+        for result in results:
+            self._fix_mermaid_diagrams(result)
+        
+        return results
+    
+    @staticmethod
+    def _number_requirements(requirements: List[str]) -> str:
+        """
+        Format requirements as a numbered list for prompts that must address each item.
+        
+        Args:
+            requirements: Requirement texts
+            
+        Returns:
+            Requirements as "Requirement k:" blocks separated by blank lines
+        """
+        return "\n\n".join(
+            f"Requirement {i}:\n{text}" for i, text in enumerate(requirements, 1)
+        )
+    
     def _fix_mermaid_diagrams(self, result: SoftwareAnalysisOutputSchema):
         """
         Fix common issues with Mermaid diagrams to ensure they render correctly.
@@ -169,26 +656,25 @@ class SoftwareAnalystAgent:
         # Fix task diagram
         if result.mermaid_task_diagram:
             # Ensure proper graph definition at the start
-            if not re.match(r'^(graph|flowchart)\s+[TBLR]D', result.mermaid_task_diagram):
+            if not _TASK_DIAGRAM_RE.match(result.mermaid_task_diagram):
                 result.mermaid_task_diagram = "graph TD\n" + result.mermaid_task_diagram
             
         # Fix ERD diagram
         if result.mermaid_erd_diagram:
             # Ensure proper ERD definition
-            if not re.match(r'^erDiagram', result.mermaid_erd_diagram):
+            if not _ERD_DIAGRAM_RE.match(result.mermaid_erd_diagram):
                 result.mermaid_erd_diagram = "erDiagram\n" + result.mermaid_erd_diagram
         
         # Fix component diagram
         if result.mermaid_component_diagram:
             # Check component diagram syntax
-            if not any(re.match(r'^(graph|flowchart|classDiagram|C4Context)', result.mermaid_component_diagram)
-                      for pattern in [r'^graph', r'^flowchart', r'^classDiagram', r'^C4Context']):
+            if not _COMPONENT_DIAGRAM_RE.match(result.mermaid_component_diagram):
                 result.mermaid_component_diagram = "flowchart TD\n" + result.mermaid_component_diagram
         
         # Fix sequence diagram
         if result.mermaid_sequence_diagram:
             # Check sequence diagram syntax
-            if not re.match(r'^sequenceDiagram', result.mermaid_sequence_diagram):
+            if not _SEQUENCE_DIAGRAM_RE.match(result.mermaid_sequence_diagram):
                 result.mermaid_sequence_diagram = "sequenceDiagram\n" + result.mermaid_sequence_diagram
     
     def analyze_from_markdown(self, file_path: str) -> SoftwareAnalysisOutputSchema:
@@ -202,13 +688,8 @@ class SoftwareAnalystAgent:
             Analysis result with task breakdown and diagrams
         """
         try:
-            md_content = MarkdownFileReader.read_file(file_path)
-            requirements = MarkdownFileReader.extract_requirements(md_content)
-            
-            # Combine all extracted requirements into a single text
-            requirement_text = "\n\n".join(requirements)
-            
-            return self.analyze_from_text(requirement_text)
+            md_content = MarkdownFileReader.read_file_fast(file_path)
+            return self.analyze_from_markdown_content(md_content)
         except FileNotFoundError as e:
             print(f"Error: {str(e)}")
             return SoftwareAnalysisOutputSchema(
@@ -218,6 +699,31 @@ class SoftwareAnalystAgent:
                 mermaid_erd_diagram=""
             )
     
+    def analyze_from_markdown_content(self, md_content: str) -> SoftwareAnalysisOutputSchema:
+        """
+        Analyze requirements from markdown content that is already in memory.
+        
+        Args:
+            md_content: Markdown content
+            
+        Returns:
+            Analysis result with task breakdown and diagrams
+        """
+        requirements = MarkdownFileReader.extract_requirements(md_content)
+        
+        # Combine all extracted requirements into a single numbered text so the
+        # model addresses every item instead of blending them together
+        if len(requirements) > 1:
+            requirement_text = (
+                f"The following {len(requirements)} requirements belong to one document. "
+                f"Cover every numbered item in a single combined analysis.\n\n"
+                f"{self._number_requirements(requirements)}"
+            )
+        else:
+            requirement_text = "\n\n".join(requirements)
+        
+        return self.analyze_from_text(requirement_text)
+    
     def analyze_from_multiple_markdown(self, file_paths: List[str]) -> SoftwareAnalysisOutputSchema:
         """
         Read requirements from multiple markdown files and analyze them together.
@@ -229,21 +735,9 @@ class SoftwareAnalystAgent:
             Analysis result with task breakdown and diagrams
         """
         try:
-            all_requirements = []
-            
-            for file_path in file_paths:
-                md_content = MarkdownFileReader.read_file(file_path)
-                requirements = MarkdownFileReader.extract_requirements(md_content)
-                file_name = os.path.basename(file_path)
-                
-                # Add header for each file's requirements
-                file_requirements = [f"# From {file_name}:", ""] + requirements
-                all_requirements.append("\n".join(file_requirements))
-            
-            # Combine all extracted requirements into a single text
-            merged_requirements = "\n\n---\n\n".join(all_requirements)
-            
-            return self.analyze_from_text(merged_requirements)
+            return self.analyze_from_multiple_markdown_content(
+                [(os.path.basename(file_path), MarkdownFileReader.read_file_fast(file_path)) for file_path in file_paths]
+            )
         except Exception as e:
             print(f"Error processing markdown files: {str(e)}")
             return SoftwareAnalysisOutputSchema(
@@ -253,89 +747,115 @@ class SoftwareAnalystAgent:
                 mermaid_erd_diagram=""
             )
     
+    def analyze_from_multiple_markdown_content(self, documents: List[Tuple[str, str]]) -> SoftwareAnalysisOutputSchema:
+        """
+        Analyze requirements from several in-memory markdown documents together.
+        
+        Args:
+            documents: (name, markdown content) pairs, e.g. uploaded file names and their text
+            
+        Returns:
+            Analysis result with task breakdown and diagrams
+        """
+        # One block per document: a header naming it, then its requirements
+        merged_requirements = "\n\n---\n\n".join(
+            f"# From {name}:\n\n" + "\n".join(MarkdownFileReader.extract_requirements(md_content))
+            for name, md_content in documents
+        )
+        
+        return self.analyze_from_text(merged_requirements)
+    
     def print_analysis_results(self, response: SoftwareAnalysisOutputSchema):
         """
         Print the analysis results in a readable format.
         
+        The report is assembled as a list of lines and written with a single print call.
+        
         Args:
             response: The analysis response to print
         """
-        print(f"\n{'=' * 80}")
-        print(f"SOFTWARE REQUIREMENT ANALYSIS RESULTS")
-        print(f"{'=' * 80}\n")
-        
-        print(f"SUMMARY:")
-        print(f"{response.summary}\n")
-        
-        print(f"TASK BREAKDOWN:")
-        self._print_task_hierarchy(response.task_breakdown)
+        lines = [
+            f"\n{'=' * 80}",
+            "SOFTWARE REQUIREMENT ANALYSIS RESULTS",
+            f"{'=' * 80}\n",
+            "SUMMARY:",
+            f"{response.summary}\n",
+            "TASK BREAKDOWN:",
+        ]
+        self._print_task_hierarchy(response.task_breakdown, lines=lines)
         
-        print(f"\nTOTAL ESTIMATE: {response.total_estimate}\n")
+        lines.append(f"\nTOTAL ESTIMATE: {response.total_estimate}\n")
         
-        print("API ANALYSIS:")
+        lines.append("API ANALYSIS:")
         for api in response.api_analysis:
-            print(f"- {api.method} {api.endpoint}: {api.purpose}")
-            print(f"  Request: {api.request_params}")
-            print(f"  Response: {api.response_structure}\n")
+            lines.append(f"- {api.method} {api.endpoint}: {api.purpose}")
+            lines.append(f"  Request: {api.request_params}")
+            lines.append(f"  Response: {api.response_structure}\n")
         
-        print("ENTITY RELATIONSHIP ANALYSIS:")
+        lines.append("ENTITY RELATIONSHIP ANALYSIS:")
         for entity in response.erd_analysis:
-            print(f"- Entity: {entity.entity_name}")
-            print(f"  Attributes: {entity.attributes}")
-            print(f"  Relationships: {entity.relationships}\n")
+            lines.append(f"- Entity: {entity.entity_name}")
+            lines.append(f"  Attributes: {entity.attributes}")
+            lines.append(f"  Relationships: {entity.relationships}\n")
         
-        print("DEVELOPMENT VIEW:")
+        lines.append("DEVELOPMENT VIEW:")
         for component in response.development_view:
-            print(f"- Component: {component.component_name}")
-            print(f"  Description: {component.description}")
-            print(f"  Responsibilities: {component.responsibilities}")
-            print(f"  Dependencies: {component.dependencies}")
-            print(f"  Technologies: {component.technologies}\n")
+            lines.append(f"- Component: {component.component_name}")
+            lines.append(f"  Description: {component.description}")
+            lines.append(f"  Responsibilities: {component.responsibilities}")
+            lines.append(f"  Dependencies: {component.dependencies}")
+            lines.append(f"  Technologies: {component.technologies}\n")
         
-        print("PROCESS VIEW:")
+        lines.append("PROCESS VIEW:")
         for flow in response.process_view:
-            print(f"- Flow: {flow.flow_name}")
-            print(f"  Description: {flow.description}")
-            print(f"  Actors: {flow.actors}")
-            print(f"  Steps: {flow.steps}\n")
+            lines.append(f"- Flow: {flow.flow_name}")
+            lines.append(f"  Description: {flow.description}")
+            lines.append(f"  Actors: {flow.actors}")
+            lines.append(f"  Steps: {flow.steps}\n")
         
-        print("RISKS AND CONSIDERATIONS:")
-        for risk in response.risks_and_considerations:
-            print(f"- {risk}")
+        lines.append("RISKS AND CONSIDERATIONS:")
+        lines.extend(f"- {risk}" for risk in response.risks_and_considerations)
         
-        print("\nSUGGESTED QUESTIONS:")
-        for question in response.suggested_questions:
-            print(f"- {question}")
+        lines.append("\nSUGGESTED QUESTIONS:")
+        lines.extend(f"- {question}" for question in response.suggested_questions)
         
-        print("\nTASK HIERARCHY DIAGRAM (MERMAID CODE):")
-        print(response.mermaid_task_diagram)
+        lines.append("\nTASK HIERARCHY DIAGRAM (MERMAID CODE):")
+        lines.append(f"{response.mermaid_task_diagram}")
         
-        print("\nENTITY RELATIONSHIP DIAGRAM (MERMAID CODE):")
-        print(response.mermaid_erd_diagram)
+        lines.append("\nENTITY RELATIONSHIP DIAGRAM (MERMAID CODE):")
+        lines.append(f"{response.mermaid_erd_diagram}")
         
-        print("\nCOMPONENT DIAGRAM (MERMAID CODE):")
-        print(response.mermaid_component_diagram)
+        lines.append("\nCOMPONENT DIAGRAM (MERMAID CODE):")
+        lines.append(f"{response.mermaid_component_diagram}")
         
-        print("\nSEQUENCE DIAGRAM (MERMAID CODE):")
-        print(response.mermaid_sequence_diagram)
+        lines.append("\nSEQUENCE DIAGRAM (MERMAID CODE):")
+        lines.append(f"{response.mermaid_sequence_diagram}")
+        
+        print("\n".join(lines))
     
-    def _print_task_hierarchy(self, tasks, indent=0):
+    def _print_task_hierarchy(self, tasks, indent=0, lines=None):
         """
-        Recursively print the task hierarchy.
+        Render the task hierarchy depth-first using an explicit stack.
         
         Args:
             tasks: List of tasks to print
-            indent: Current indentation level
+            indent: Indentation level of the top-level tasks
+            lines: Output buffer to append to; printed directly when omitted
         """
-        for task in tasks:
+        buffer = [] if lines is None else lines
+        stack = [(task, indent) for task in reversed(tasks)]
+        while stack:
+            task, depth = stack.pop()
             difficulty = f"({task.difficulty})" if task.difficulty else ""
             estimate = f"Est: {task.time_estimate}" if task.time_estimate else ""
-            print(f"{'  ' * indent}- {task.task_name} {difficulty} {estimate}")
+            buffer.append(f"{'  ' * depth}- {task.task_name} {difficulty} {estimate}")
             if task.description:
-                print(f"{'  ' * (indent+1)}Description: {task.description}")
+                buffer.append(f"{'  ' * (depth+1)}Description: {task.description}")
             if task.subtasks:
-                self._print_task_hierarchy(task.subtasks, indent + 1)
-
+                stack.extend((subtask, depth + 1) for subtask in reversed(task.subtasks))
+        
+        if lines is None and buffer:
+            print("\n".join(buffer))
 
 # Example usage
 if __name__ == "__main__":
@@ -1,41 +1,55 @@
 import streamlit as st
 import os
-import tempfile
 import re
-from est_egg.software_analyst_agent import SoftwareAnalystAgent
-import streamlit.components.v1 as components
+import orjson
+import hashlib
+import functools
+from typing import TYPE_CHECKING
 import pandas as pd
-import html
-import uuid
 from streamlit_markdown import st_markdown  # Import the streamlit-markdown package
 
+if TYPE_CHECKING:
+    from est_egg.software_analyst_agent import SoftwareAnalystAgent
+
+# Time estimates such as "6 hours" or "2.5d", matched by convert_to_mandays
+_HOURS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:hours|hour|hrs|hr|h)', re.IGNORECASE)
+_DAYS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:days|day|d)', re.IGNORECASE)
+
+# Number of analyses remembered per session for repeated submissions
+ANALYSIS_CACHE_SIZE = 8
+
 def display_task_hierarchy(tasks, level=0):
     """Render task breakdown as markdown with proper indentation"""
-    result = ""
-    for task in tasks:
+    parts = []
+    # Depth-first walk with an explicit stack; reversed pushes keep the original task order
+    stack = [(task, level) for task in reversed(tasks)]
+    while stack:
+        task, depth = stack.pop()
         difficulty = f"({task.difficulty})" if task.difficulty else ""
         estimate = f"Est: {task.time_estimate}" if task.time_estimate else ""
-        result += f"{'  ' * level}- **{task.task_name}** {difficulty} {estimate}\n"
+        parts.append(f"{'  ' * depth}- **{task.task_name}** {difficulty} {estimate}\n")
         if task.description:
-            result += f"{'  ' * (level+1)}{task.description}\n"
+            parts.append(f"{'  ' * (depth+1)}{task.description}\n")
         if task.subtasks:
-            result += display_task_hierarchy(task.subtasks, level + 1)
-    return result
+            stack.extend((subtask, depth + 1) for subtask in reversed(task.subtasks))
+    return "".join(parts)
 
+# LLM estimates reuse a handful of phrasings ("4 hours", "1 day"), so most rows are cache hits
+@functools.lru_cache(maxsize=1024)
 def convert_to_mandays(time_estimate_str):
     """Convert a time estimate string to mandays (1 manday = 7 hours)"""
     if not time_estimate_str:
         return ""
     
     # Check for hours
-    hours_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:hours|hour|hrs|hr|h)', time_estimate_str, re.IGNORECASE)
+    hours_match = _HOURS_RE.search(time_estimate_str)
     if hours_match:
         hours = float(hours_match.group(1))
         mandays = hours / 7
         return f"{mandays:.2f}"
     
     # Check for days
-    days_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:days|day|d)', time_estimate_str, re.IGNORECASE)
+    days_match = _DAYS_RE.search(time_estimate_str)
     if days_match:
         days = float(days_match.group(1))
         return f"{days:.2f}"
@@ -44,72 +58,74 @@ def convert_to_mandays(time_estimate_str):
     return time_estimate_str
 
 def build_task_table(tasks):
-    """Build table data from task hierarchy"""
-    task_rows = []
+    """Build table data from task hierarchy, as one list per column"""
+    names, difficulties, descriptions, mandays, estimates = [], [], [], [], []
     
-    def process_task(task, depth=0):
+    # Depth-first with an explicit stack; children are pushed reversed to keep their order
+    stack = [(task, 0) for task in reversed(tasks)]
+    while stack:
+        task, depth = stack.pop()
+        
         # Convert time estimate to mandays if it exists
         estimate = task.time_estimate if task.time_estimate else ""
         manday_estimate = convert_to_mandays(estimate)
         
         # Add the task to the data with appropriate indentation
-        row = {
-            "Task Name": "• " * depth + task.task_name,
-            "Difficulty": task.difficulty if task.difficulty else "",
-            "Description": task.description if task.description else "",
-            "Estimated Time (mandays)": manday_estimate,
-            "Original Estimate": estimate
-        }
-        task_rows.append(row)
+        names.append("• " * depth + (task.task_name or ""))
+        difficulties.append(task.difficulty if task.difficulty else "")
+        descriptions.append(task.description if task.description else "")
+        mandays.append(manday_estimate)
+        estimates.append(estimate)
         
         # Process subtasks
         if task.subtasks:
-            for subtask in task.subtasks:
-                process_task(subtask, depth + 1)
-    
-    # Process all top-level tasks
-    for task in tasks:
-        process_task(task)
+            stack.extend((subtask, depth + 1) for subtask in reversed(task.subtasks))
     
-    return task_rows
+    return {
+        "Task Name": names,
+        "Difficulty": difficulties,
+        "Description": descriptions,
+        "Estimated Time (mandays)": mandays,
+        "Original Estimate": estimates
+    }
 
 def display_api_endpoints(apis):
     """Render API endpoints as markdown"""
-    result = ""
+    parts = []
     for api in apis:
-        result += f"### {api.method} {api.endpoint}\n"
+        parts.append(f"### {api.method} {api.endpoint}\n")
         if api.purpose:
-            result += f"**Purpose**: {api.purpose}\n\n"
+            parts.append(f"**Purpose**: {api.purpose}\n\n")
         
         if api.request_params:
-            result += "**Request Parameters:**\n```json\n"
-            result += str(api.request_params).replace("'", "\"") + "\n"
-            result += "```\n\n"
+            parts.append("**Request Parameters:**\n```json\n")
+            parts.append(orjson.dumps(api.request_params, option=orjson.OPT_INDENT_2).decode() + "\n")
+            parts.append("```\n\n")
         
         if api.response_structure:
-            result += "**Response Structure:**\n```json\n"
-            result += str(api.response_structure).replace("'", "\"") + "\n"
-            result += "```\n\n"
-    return result
+            parts.append("**Response Structure:**\n```json\n")
+            parts.append(orjson.dumps(api.response_structure, option=orjson.OPT_INDENT_2).decode() + "\n")
+            parts.append("```\n\n")
+    return "".join(parts)
 
 def display_entities(entities):
     """Render entities as markdown"""
-    result = ""
+    parts = []
     for entity in entities:
-        result += f"### {entity.entity_name}\n"
+        parts.append(f"### {entity.entity_name}\n")
         
         if entity.attributes:
-            result += "**Attributes:**\n```\n"
+            parts.append("**Attributes:**\n```\n")
             for attr, type_info in entity.attributes.items():
-                result += f"{attr}: {type_info}\n"
-            result += "```\n\n"
+                parts.append(f"{attr}: {type_info}\n")
+            parts.append("```\n\n")
         
         if entity.relationships:
-            result += "**Relationships:**\n"
+            parts.append("**Relationships:**\n")
             for rel in entity.relationships:
-                result += f"- {rel}\n"
-            result += "\n"
-    return result
+                parts.append(f"- {rel}\n")
+            parts.append("\n")
+    return "".join(parts)
 
 def sanitize_mermaid(mermaid_code):
     """
@@ -144,35 +160,48 @@ def sanitize_mermaid(mermaid_code):
     
     return mermaid_code
 
-def render_mermaid(mermaid_code, diagram_type=""):
+def render_mermaid_diagrams(diagrams):
     """
-    Render Mermaid diagram using streamlit-markdown
+    Render Mermaid diagrams using streamlit-markdown, all in one component
+    
+    Every diagram shares a single iframe and mermaid instance instead of each
+    starting its own.
     
     Args:
-        mermaid_code: The mermaid diagram code to render
-        diagram_type: Type of diagram for descriptive purposes
+        diagrams: (title, diagram type, mermaid code) triples in display order
     """
-    if not mermaid_code:
-        st.info(f"No {diagram_type} diagram available.")
+    sections = []
+    for title, diagram_type, mermaid_code in diagrams:
+        if mermaid_code:
+            # Format the code as a mermaid code block for markdown rendering
+            sections.append(f"### {title}\n\n```mermaid\n{mermaid_code}\n```")
+        else:
+            st.info(f"No {diagram_type} diagram available.")
+    
+    if not sections:
         return
-        
-    # Format the code as a mermaid code block for markdown rendering
-    markdown_text = f"```mermaid\n{mermaid_code}\n```"
+    markdown_text = "\n\n".join(sections)
     
     try:
-        # Render using st_markdown from streamlit-markdown package with a unique key
-        diagram_id = f"mermaid-{uuid.uuid4().hex[:8]}"
-        st_markdown(markdown_text, key=diagram_id)
+        # The key is derived from the content so reruns keep the mounted component
+        # instead of rebuilding its iframe
+        digest = hashlib.blake2b(markdown_text.encode("utf-8"), digest_size=8).hexdigest()
+        st_markdown(markdown_text, key=f"mermaid-{digest}")
         
         # Still display the code for reference
         with st.expander("View Mermaid Code"):
-            st.code(mermaid_code, language="mermaid")
+            for title, _, mermaid_code in diagrams:
+                if mermaid_code:
+                    st.markdown(f"**{title}**")
+                    st.code(mermaid_code, language="mermaid")
     except Exception as e:
-        st.error(f"Error rendering diagram: {str(e)}")
-        st.code(mermaid_code, language="mermaid")
+        st.error(f"Error rendering diagrams: {str(e)}")
+        for title, _, mermaid_code in diagrams:
+            if mermaid_code:
+                st.code(mermaid_code, language="mermaid")
 
-def merge_requirements(text_requirement, uploaded_files):
-    """Merge requirements from text input and uploaded files"""
+def merge_requirements(text_requirement, files):
+    """Merge requirements from text input and decoded uploaded files ((name, content) pairs)"""
     requirements = []
     
     # Add text requirement if provided
@@ -180,10 +209,7 @@ def merge_requirements(text_requirement, uploaded_files):
         requirements.append(text_requirement.strip())
     
     # Process uploaded files
-    file_contents = []
-    for uploaded_file in uploaded_files:
-        content = uploaded_file.read().decode("utf-8")
-        file_contents.append(f"## From file: {uploaded_file.name}\n{content}")
+    file_contents = [f"## From file: {name}\n{content}" for name, content in files]
     
     # Add file contents to requirements
     if file_contents:
@@ -192,55 +218,151 @@ def merge_requirements(text_requirement, uploaded_files):
     # Merge all requirements
     return "\n\n---\n\n".join(requirements)
 
+@st.cache_resource(max_entries=4)
+def get_agent(api_key: str) -> "SoftwareAnalystAgent":
+    """Share one analyst (and its HTTP connection pool) per API key across reruns"""
+    # Imported on first use so the page renders before openai/instructor/atomic_agents load
+    from est_egg.software_analyst_agent import SoftwareAnalystAgent
+    return SoftwareAnalystAgent(api_key=api_key)
+
+def read_uploaded_files(uploaded_files):
+    """
+    Decode uploaded files, reusing the text decoded on earlier reruns.
+    
+    Args:
+        uploaded_files: Files returned by st.file_uploader
+        
+    Returns:
+        (file name, decoded content) pairs in upload order; files sharing a name are all kept
+    """
+    # Keyed by upload id, so re-uploading a changed file with the same name is decoded again
+    file_cache = st.session_state.setdefault("_file_cache", {})
+    live_ids = {uploaded_file.file_id for uploaded_file in uploaded_files}
+    for file_id in file_cache.keys() - live_ids:
+        del file_cache[file_id]
+    
+    files = []
+    for uploaded_file in uploaded_files:
+        if uploaded_file.file_id not in file_cache:
+            file_cache[uploaded_file.file_id] = uploaded_file.getvalue().decode("utf-8")
+        files.append((uploaded_file.name, file_cache[uploaded_file.file_id]))
+    return files
+
+def input_digest(requirement_text, files):
+    """Fingerprint the submitted text and uploaded file contents to detect repeated submissions"""
+    digest = hashlib.blake2b(requirement_text.encode("utf-8"), digest_size=16)
+    for name, content in files:
+        digest.update(b"\0" + name.encode("utf-8") + b"\0")
+        digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+def analyze_requirement_text(api_key, requirement_text):
+    """Analyze requirement text, previewing the summary, tasks and APIs while the LLM streams them"""
+    analyst = get_agent(api_key)
+    summary_preview = st.empty()
+    task_preview = st.empty()
+    api_preview = st.empty()
+    result = None
+    summary = task_table = api_list = None
+    
+    # Fields arrive in schema order, so each placeholder fills in as its section streams.
+    # A placeholder is only redrawn when its content changed since the previous partial.
+    # Repeated input is served from the analyst's response cache in a single step
+    for result in analyst.stream_from_text(requirement_text):
+        if result.summary and result.summary != summary:
+            summary = result.summary
+            summary_preview.markdown(f"**Summary**: {summary}")
+        if result.task_breakdown:
+            table = build_task_table(result.task_breakdown)
+            if table != task_table:
+                task_table = table
+                task_preview.dataframe(pd.DataFrame(task_table), hide_index=True, use_container_width=True)
+        if result.api_analysis:
+            # Partial endpoints can lack a method or path until their fields stream in
+            endpoints = "\n".join(
+                f"- `{api.method} {api.endpoint}`"
+                for api in result.api_analysis if api.method and api.endpoint
+            )
+            if endpoints != api_list:
+                api_list = endpoints
+                api_preview.markdown(api_list)
+    
+    summary_preview.empty()
+    task_preview.empty()
+    api_preview.empty()
+    return result
+
 def display_development_components(components):
     """Render development components as markdown"""
-    result = ""
+    parts = []
     for component in components:
-        result += f"### {component.component_name}\n"
+        parts.append(f"### {component.component_name}\n")
         
         if component.description:
-            result += f"{component.description}\n\n"
+            parts.append(f"{component.description}\n\n")
         
         if component.responsibilities:
-            result += "**Responsibilities:**\n"
+            parts.append("**Responsibilities:**\n")
             for resp in component.responsibilities:
-                result += f"- {resp}\n"
-            result += "\n"
+                parts.append(f"- {resp}\n")
+            parts.append("\n")
         
         if component.dependencies:
-            result += "**Dependencies:**\n"
+            parts.append("**Dependencies:**\n")
             for dep in component.dependencies:
-                result += f"- {dep}\n"
-            result += "\n"
+                parts.append(f"- {dep}\n")
+            parts.append("\n")
             
         if component.technologies:
-            result += "**Technologies:**\n"
+            parts.append("**Technologies:**\n")
             for tech in component.technologies:
-                result += f"- {tech}\n"
-            result += "\n"
-    return result
+                parts.append(f"- {tech}\n")
+            parts.append("\n")
+    return "".join(parts)
 
 def display_process_flows(flows):
     """Render process flows as markdown"""
-    result = ""
+    parts = []
     for flow in flows:
-        result += f"### {flow.flow_name}\n"
+        parts.append(f"### {flow.flow_name}\n")
         
         if flow.description:
-            result += f"{flow.description}\n\n"
+            parts.append(f"{flow.description}\n\n")
         
         if flow.actors:
-            result += "**Actors:**\n"
+            parts.append("**Actors:**\n")
             for actor in flow.actors:
-                result += f"- {actor}\n"
-            result += "\n"
+                parts.append(f"- {actor}\n")
+            parts.append("\n")
         
         if flow.steps:
-            result += "**Process Steps:**\n"
+            parts.append("**Process Steps:**\n")
             for i, step in enumerate(flow.steps, 1):
-                result += f"{i}. {step}\n"
-            result += "\n"
-    return result
+                parts.append(f"{i}. {step}\n")
+            parts.append("\n")
+    return "".join(parts)
+
+def results_digest(results):
+    """Fingerprint an analysis by content, to key the cached renderers below"""
+    return hashlib.blake2b(results.model_dump_json().encode("utf-8"), digest_size=16).hexdigest()
+
+# Renderers cached by results_digest. Streamlit skips hashing underscore-prefixed
+# arguments, so reruns look up the short key instead of re-hashing the whole tree
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_task_table(results_key, _tasks):
+    return build_task_table(_tasks)
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_task_hierarchy(results_key, _tasks):
+    return display_task_hierarchy(_tasks)
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_api_endpoints(results_key, _apis):
+    return display_api_endpoints(_apis)
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _cached_entities(results_key, _entities):
+    return display_entities(_entities)
 
 def main():
     st.set_page_config(
@@ -257,6 +379,7 @@ def main():
         st.session_state.api_key = os.environ.get("OPENAI_API_KEY", "")
     if "analysis_results" not in st.session_state:
         st.session_state.analysis_results = None
+        st.session_state.analysis_key = None
     
     # Sidebar for input configuration
     st.sidebar.header("Settings")
@@ -273,6 +396,7 @@ def main():
     
     requirement_text = ""
     uploaded_files = []
+    files = []
     
     if use_text_input:
         requirement_text = st.text_area(
@@ -285,11 +409,10 @@ def main():
         uploaded_files = st.file_uploader("Upload markdown files", type=["md"], accept_multiple_files=True)
         
         if uploaded_files:
+            files = read_uploaded_files(uploaded_files)
             st.subheader("File Previews")
-            for i, uploaded_file in enumerate(uploaded_files):
-                with st.expander(f"Preview: {uploaded_file.name}"):
-                    content = uploaded_file.read().decode("utf-8")
-                    uploaded_file.seek(0)  # Reset file pointer after reading
+            for i, (name, content) in enumerate(files):
+                with st.expander(f"Preview: {name}"):
                     st.text_area(f"File {i+1} content:", value=content[:500] + ("..." if len(content) > 500 else ""), height=150, disabled=True)
     
     if st.button("Analyze Requirements"):
@@ -303,40 +426,38 @@ def main():
             return
             
         try:
-            with st.spinner("Analyzing requirements..."):
-                analyst = SoftwareAnalystAgent(api_key=api_key)
-                
-                if uploaded_files and not requirement_text.strip():
-                    # Only file uploads
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        temp_files = []
-                        for uploaded_file in uploaded_files:
-                            temp_path = os.path.join(temp_dir, uploaded_file.name)
-                            with open(temp_path, "wb") as f:
-                                f.write(uploaded_file.getbuffer())
-                            temp_files.append(temp_path)
-                        
-                        results = analyst.analyze_from_multiple_markdown(temp_files)
+            # Recent analyses by input fingerprint; dicts keep insertion order, so the first key is the oldest
+            analysis_cache = st.session_state.setdefault("_analysis_cache", {})
+            input_hash = input_digest(requirement_text, files)
+            if input_hash in analysis_cache:
+                st.session_state.analysis_results = analysis_cache[input_hash]
+                st.session_state.analysis_key = results_digest(analysis_cache[input_hash])
+                st.info("Re-using previous analysis (identical input).")
+            else:
+                with st.spinner("Analyzing requirements..."):
+                    if uploaded_files and not requirement_text.strip():
+                        # Only file uploads
+                        analyst = get_agent(api_key)
+                        results = analyst.analyze_from_multiple_markdown_content(files)
                 
-                elif requirement_text.strip() and not uploaded_files:
-                    # Only text input
-                    results = analyst.analyze_from_text(requirement_text)
+                    elif requirement_text.strip() and not uploaded_files:
+                        # Only text input
+                        results = analyze_requirement_text(api_key, requirement_text)
                 
-                else:
-                    # Both inputs - merge them
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        temp_files = []
-                        for uploaded_file in uploaded_files:
-                            temp_path = os.path.join(temp_dir, uploaded_file.name)
-                            with open(temp_path, "wb") as f:
-                                f.write(uploaded_file.getbuffer())
-                            temp_files.append(temp_path)
-                        
-                        merged_requirement = merge_requirements(requirement_text, uploaded_files)
-                        results = analyst.analyze_from_text(merged_requirement)
+                    else:
+                        # Both inputs - merge them
+                        merged_requirement = merge_requirements(requirement_text, files)
+                        results = analyze_requirement_text(api_key, merged_requirement)
                 
-                st.session_state.analysis_results = results
-                st.success("Analysis complete!")
+                    st.session_state.analysis_results = results
+                    if results is None:
+                        st.error("The analysis returned no results. Please try again.")
+                        return
+                    st.session_state.analysis_key = results_digest(results)
+                    analysis_cache[input_hash] = results
+                    while len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+                        del analysis_cache[next(iter(analysis_cache))]
+                    st.success("Analysis complete!")
         except Exception as e:
             st.error(f"Error during analysis: {str(e)}")
     
@@ -344,6 +465,7 @@ def main():
     if st.session_state.analysis_results:
         st.header("Analysis Results")
         results = st.session_state.analysis_results
+        results_key = st.session_state.get("analysis_key")
         
         # Create tabs for different sections
         tabs = st.tabs([
@@ -369,9 +491,10 @@ def main():
             st.subheader("Task Breakdown")
             
             # Create a table for task breakdown
-            task_data = build_task_table(results.task_breakdown)
-            if task_data:
-                df = pd.DataFrame(task_data)
+            task_data = _cached_task_table(results_key, results.task_breakdown)
+            if task_data["Task Name"]:
+                # Difficulty repeats a few labels, so store it as a category
+                df = pd.DataFrame(task_data).astype({"Difficulty": "category"})
                 # Hide the original estimate column but keep it for reference
                 columns_to_display = ["Task Name", "Difficulty", "Description", "Estimated Time (mandays)"]
                 st.dataframe(
@@ -382,7 +505,7 @@ def main():
                 
                 # Show the raw breakdown as well (optional - can be expanded)
                 with st.expander("View Hierarchical Breakdown"):
-                    task_md = display_task_hierarchy(results.task_breakdown)
+                    task_md = _cached_task_hierarchy(results_key, results.task_breakdown)
                     st.markdown(task_md)
             else:
                 st.info("No task breakdown available.")
@@ -391,7 +514,7 @@ def main():
         with tabs[2]:
             st.subheader("API Endpoint Design")
             if results.api_analysis:
-                api_md = display_api_endpoints(results.api_analysis)
+                api_md = _cached_api_endpoints(results_key, results.api_analysis)
                 st.markdown(api_md)
             else:
                 st.info("No API endpoints specified in the analysis.")
@@ -400,7 +523,7 @@ def main():
         with tabs[3]:
             st.subheader("Entity Relationship Analysis")
             if results.erd_analysis:
-                erd_md = display_entities(results.erd_analysis)
+                erd_md = _cached_entities(results_key, results.erd_analysis)
                 st.markdown(erd_md)
             else:
                 st.info("No entities specified in the analysis.")
@@ -441,29 +564,12 @@ def main():
         
         # Tab 8: Diagrams
         with tabs[7]:
-            st.subheader("Task Hierarchy Diagram")
-            if results.mermaid_task_diagram:
-                render_mermaid(results.mermaid_task_diagram, "task hierarchy")
-            else:
-                st.info("No task diagram available.")
-                
-            st.subheader("Entity Relationship Diagram")
-            if results.mermaid_erd_diagram:
-                render_mermaid(results.mermaid_erd_diagram, "entity relationship")
-            else:
-                st.info("No ERD diagram available.")
-                
-            st.subheader("Component Diagram")
-            if results.mermaid_component_diagram:
-                render_mermaid(results.mermaid_component_diagram, "component")
-            else:
-                st.info("No component diagram available.")
-                
-            st.subheader("Sequence Diagram")
-            if results.mermaid_sequence_diagram:
-                render_mermaid(results.mermaid_sequence_diagram, "sequence")
-            else:
-                st.info("No sequence diagram available.")
+            render_mermaid_diagrams([
+                ("Task Hierarchy Diagram", "task", results.mermaid_task_diagram),
+                ("Entity Relationship Diagram", "ERD", results.mermaid_erd_diagram),
+                ("Component Diagram", "component", results.mermaid_component_diagram),
+                ("Sequence Diagram", "sequence", results.mermaid_sequence_diagram)
+            ])
 
 def run_streamlit():
     """Entry point for running the Streamlit app."""
@@ -1,8 +1,8 @@
 from typing import List
 from pydantic import Field
-from atomic_agents.lib.components.agent_memory import AgentMemory
-from atomic_agents.agents.base_agent import BaseAgent, BaseAgentConfig, BaseIOSchema, BaseAgentOutputSchema
-from atomic_agents.lib.components.system_prompt_generator import SystemPromptContextProviderBase, SystemPromptGenerator
+from atomic_agents.agents.base_agent import BaseAgent, BaseAgentConfig, BaseIOSchema
+from atomic_agents.lib.components.system_prompt_generator import SystemPromptGenerator
+import functools
 import instructor
 import openai
 import os
@@ -35,25 +35,29 @@ system_prompt_generator = SystemPromptGenerator(
         "Conclude with 3 relevant suggested questions."
     ]
 )
-api_key = os.environ.get("OPENAI_API_KEY")
-print('api_key', api_key)
-# Initialize the agent
-agent = BaseAgent(
-    config=BaseAgentConfig(
-        client=instructor.from_openai(openai.OpenAI(api_key=api_key)),
-        model="gpt-4o",
-        system_prompt_generator=system_prompt_generator,
-        input_schema=CustomInputSchema,
-        output_schema=CustomOutputSchema
+@functools.lru_cache(maxsize=1)
+def get_agent() -> BaseAgent:
+    """Build the agent on first use so importing this module makes no API calls."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if os.getenv("EST_DEBUG"):
+        print('api_key', api_key)
+    return BaseAgent(
+        config=BaseAgentConfig(
+            client=instructor.from_openai(openai.OpenAI(api_key=api_key)),
+            model="gpt-4o",
+            system_prompt_generator=system_prompt_generator,
+            input_schema=CustomInputSchema,
+            output_schema=CustomOutputSchema
+        )
     )
-)
 
-user_input = "Estimate the time needed to implement a feature that allows users to upload images to the system."
-user_input = CustomInputSchema(user_input=user_input)
+if __name__ == "__main__":
+    user_input = "Estimate the time needed to implement a feature that allows users to upload images to the system."
+    user_input = CustomInputSchema(user_input=user_input)
 
-# Use the agent
-response = agent.run(user_input)
-print(f"Agent: {response.chat_message}")
-print("Suggested questions:")
-for question in response.suggested_questions:
-    print(f"- {question}")
\ No newline at end of file
+    # Use the agent
+    response = get_agent().run(user_input)
+    print(f"Agent: {response.chat_message}")
+    print("Suggested questions:")
+    for question in response.suggested_questions:
+        print(f"- {question}")
@@ -8,6 +8,9 @@ setup(
         "streamlit>=1.8.0",
         "pandas>=1.3.0",
         "openai>=1.0.0",
+        "httpx[http2]>=0.27.0",
+        "tenacity>=8.0.0",
+        "orjson>=3.9.0",
         "instructor>=0.6.0",
         "streamlit-markdown>=1.1.0",  # Add this for Mermaid support
     ],